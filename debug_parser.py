@@ -32,7 +32,7 @@ def debug_pdf_text(pdf_path):
         print(f"Total Pages: {parsed['total_pages']}")
         print(f"Processed Pages: {parsed['processed_pages']}")
         print(f"Total Words: {parsed['total_words']}")
-        print(f"Total Characters: {len(parsed['full_text'])}")
+        print(f"Total Characters: {parsed['full_text_len']}")
         
         print("\n" + "="*80)
         print("📝 FULL TEXT (First 2000 characters)")
@@ -41,8 +41,8 @@ def debug_pdf_text(pdf_path):
         # Show first 2000 characters
         print(parsed['full_text'][:2000])
         
-        if len(parsed['full_text']) > 2000:
-            print(f"\n... [Text truncated - {len(parsed['full_text']) - 2000} more characters]")
+        if parsed['full_text_len'] > 2000:
+            print(f"\n... [Text truncated - {parsed['full_text_len'] - 2000} more characters]")
         
         print("\n" + "="*80)
         print("📄 PAGE-BY-PAGE BREAKDOWN")
@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 from pipeline import PDFProcessingPipeline
 from credit_card_parser import CreditCardStatementParser
-import json
+from json_out import dump_json
 
 def print_separator():
     print("\n" + "="*80 + "\n")
@@ -68,8 +68,7 @@ def parse_credit_card_statement(file_path):
     save_choice = input("💾 Save results to JSON file? (y/n): ").strip().lower()
     if save_choice == 'y':
         output_file = "credit_card_parsed_results.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2)
+        dump_json(result, output_file)
         print(f"✅ Results saved to: {output_file}")
     
     print_separator()
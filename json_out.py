@@ -0,0 +1,22 @@
+import json
+
+# orjson serializes in C several times faster than stdlib json with
+# indent; fall back to the stdlib when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json(obj, path):
+    """
+    Write obj to path as indented JSON, using orjson when available.
+    Both branches emit UTF-8 without ASCII escaping, so the output is
+    byte-identical in spirit regardless of which serializer runs.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
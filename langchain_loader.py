@@ -1,8 +1,18 @@
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from langchain.schema import Document
 from langchain.document_loaders.base import BaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from parser import CustomPDFParser  # import the parser defined above
+# Parser instances keyed by their config so loaders for the same settings
+# share one CustomPDFParser instead of rebuilding it per loader
+_PARSER_CACHE: Dict[tuple, CustomPDFParser] = {}
+def _get_parser(parser_config: Dict[str, Any]) -> CustomPDFParser:
+   """Return a shared CustomPDFParser for parser_config, building it once."""
+   key = tuple(sorted(parser_config.items()))
+   parser = _PARSER_CACHE.get(key)
+   if parser is None:
+       parser = _PARSER_CACHE[key] = CustomPDFParser(**parser_config)
+   return parser
 class LangChainPDFLoader(BaseLoader):
    def __init__(
        self,file_path: str,parser_config: Optional[Dict[str, Any]] = None,chunk_size: int = 500, chunk_overlap: int = 50
@@ -19,23 +29,28 @@ class LangChainPDFLoader(BaseLoader):
        self.parser_config = parser_config or {}
        self.chunk_size = chunk_size
        self.chunk_overlap = chunk_overlap
-       self.parser = CustomPDFParser(**self.parser_config)
-   def load(self) -> List[Document]:
+       self.parser = _get_parser(self.parser_config)
+   def lazy_load(self) -> Iterator[Document]:
        """
-       Load PDF, parse pages, and convert each page to a LangChain Document.
+       Lazily yield one LangChain Document per parsed page, so consumers
+       can stream pages without materializing the whole list.
        Returns:
-           List of Document objects with page text and combined metadata.
+           Iterator of Document objects with page text and combined metadata.
        """
        parsed_data = self.parser.parse_pdf(self.file_path)
-       documents = []
        # Convert each page dict to a LangChain Document
        for page_data in parsed_data["pages"]:
            if page_data["text"]:
                # Merge document-level and page-level metadata
                metadata = {**parsed_data["document_metadata"], **page_data["metadata"]}
-               doc = Document(page_content=page_data["text"], metadata=metadata)
-               documents.append(doc)
-       return documents
+               yield Document(page_content=page_data["text"], metadata=metadata)
+   def load(self) -> List[Document]:
+       """
+       Load PDF, parse pages, and convert each page to a LangChain Document.
+       Returns:
+           List of Document objects with page text and combined metadata.
+       """
+       return list(self.lazy_load())
    def load_and_split(self) -> List[Document]:
        """
        Load the PDF and split large documents into smaller chunks.
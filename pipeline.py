@@ -1,9 +1,46 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+import os
+import queue
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Dict, Any
 from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from parser import CustomPDFParser
 from langchain_loader import LangChainPDFLoader
 import logging
+# aiohttp is only needed for remote (http/https) statement paths; the
+# async API still works for local files without it
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 logger = logging.getLogger(__name__)
+def _process_pdf_worker(args):
+   """
+   Module-level worker for the process backend; must be picklable so it can
+   be shipped to worker interpreters.
+   Args:
+       args: (parser_config, pdf_path, kwargs) tuple
+   Returns:
+       The process_single_pdf result for pdf_path
+   """
+   parser_config, pdf_path, kwargs = args
+   return PDFProcessingPipeline(parser_config).process_single_pdf(pdf_path, **kwargs)
+def _copy_result(result: Any) -> Any:
+   """
+   Shallow-copy a cached pipeline result so the cache never hands out the
+   object it stores: a caller appending to a Document list or rewriting a
+   dict key would otherwise corrupt every later hit. Strings are immutable
+   and returned as-is.
+   """
+   if isinstance(result, dict):
+       return dict(result)
+   if isinstance(result, list):
+       return list(result)
+   return result
 class PDFProcessingPipeline:
    def __init__(self, parser_config: Optional[Dict[str, Any]] = None):
        """
@@ -11,8 +48,54 @@ class PDFProcessingPipeline:
           parser_config: dictionary of options passed to CustomPDFParser
        """
        self.parser_config = parser_config or {}
+       # Shared parser instance, built lazily; re-instantiating per call
+       # would repay any per-instance setup cost once per PDF
+       self._parser: Optional[CustomPDFParser] = None
+       # Splitters keyed by (chunk_size, chunk_overlap) so repeated calls
+       # with the same chunking config reuse one instance
+       self._splitter_cache: Dict[tuple, RecursiveCharacterTextSplitter] = {}
+       # LRU of finished results keyed by (path, mtime_ns, size, output
+       # format, chunk params, parser config); re-running the pipeline on
+       # an unchanged file during iterative development skips the parse
+       self._result_cache: OrderedDict = OrderedDict()
+       self._result_cache_size = 32
+       # process_pdfs' thread backend calls process_single_pdf from
+       # multiple workers; the OrderedDict is not safe to mutate unlocked
+       self._result_cache_lock = threading.Lock()
+   def _get_parser(self) -> CustomPDFParser:
+       """Return the pipeline's CustomPDFParser, building it on first use."""
+       if self._parser is None:
+           self._parser = CustomPDFParser(**self.parser_config)
+       return self._parser
+   def _get_splitter(
+       self,chunk_size: int,chunk_overlap: int,tokenizer: Optional[Callable[[str], List[Any]]] = None
+   ) -> RecursiveCharacterTextSplitter:
+       """
+       Return a shared text splitter for the given chunking parameters.
+       With a tokenizer, chunk_size/chunk_overlap are measured in tokens
+       (the stride downstream embedders actually see) instead of characters.
+       """
+       key = (chunk_size, chunk_overlap, tokenizer)
+       splitter = self._splitter_cache.get(key)
+       if splitter is None:
+           if tokenizer is not None:
+               # Storage grows as K/(K-O) with overlap O and chunk size K
+               if chunk_overlap * 2 > chunk_size:
+                   logger.warning(
+                       f"chunk_overlap {chunk_overlap} exceeds half of chunk_size "
+                       f"{chunk_size}; stored chunks will more than double")
+               length_function = lambda text: len(tokenizer(text))
+           else:
+               length_function = len
+           splitter = self._splitter_cache[key] = RecursiveCharacterTextSplitter(
+               chunk_size=chunk_size,
+               chunk_overlap=chunk_overlap,
+               length_function=length_function,
+               separators=["\n\n", "\n", " ", ""]  # hierarchical splitting
+           )
+       return splitter
    def process_single_pdf(
-       self,pdf_path: str,output_format: str = "langchain",chunk_documents: bool = True,chunk_size: int = 500,chunk_overlap: int = 50
+       self,pdf_path: str,output_format: str = "langchain",chunk_documents: bool = True,chunk_size: int = 500,chunk_overlap: int = 50,output_stream: Optional[Any] = None,tokenizer: Optional[Callable[[str], List[Any]]] = None
    ) -> Any:
        """
        Args:
@@ -20,25 +103,292 @@ class PDFProcessingPipeline:
            output_format: "raw" (dict), "langchain" (Documents), or "text" (string)
            chunk_documents: whether to split LangChain documents into chunks
            chunk_size: chunk size for splitting
-           chunk_overlap: chunk overlap for splitting
+           chunk_overlap: chunk overlap (the stride) for splitting
+           output_stream: for "text" output, a file-like object to stream
+               page text into instead of returning one combined string
+           tokenizer: optional callable mapping text to tokens; when given,
+               chunk_size/chunk_overlap are measured in tokens so the overlap
+               matches what downstream embedders see
        Returns:
-           Parsed content in the requested format
+           Parsed content in the requested format (None when streaming to
+           output_stream)
        """
+       # Result-cache key: the file's identity (path, mtime, size) plus
+       # every option that shapes the output. Streaming and custom
+       # tokenizers bypass the cache.
+       cache_key = None
+       if output_stream is None and tokenizer is None:
+           try:
+               stat = os.stat(pdf_path)
+               cache_key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size,
+                            output_format, chunk_documents, chunk_size, chunk_overlap,
+                            tuple(sorted(self.parser_config.items())))
+           except OSError:
+               cache_key = None
+           if cache_key is not None:
+               with self._result_cache_lock:
+                   if cache_key in self._result_cache:
+                       self._result_cache.move_to_end(cache_key)
+                       # Hand out a copy so callers mutating their result
+                       # cannot poison the cached entry
+                       return _copy_result(self._result_cache[cache_key])
        if output_format == "raw":
            # Use raw CustomPDFParser output
-           parser = CustomPDFParser(**self.parser_config)
-           return parser.parse_pdf(pdf_path)
+           result = self._get_parser().parse_pdf(pdf_path)
        elif output_format == "langchain":
-           # Use LangChain loader, optionally chunked
+           # Use LangChain loader, optionally chunked with the shared splitter
            loader = LangChainPDFLoader(pdf_path, self.parser_config, chunk_size, chunk_overlap)
            if chunk_documents:
-               return loader.load_and_split()
+               documents = loader.load()
+               # Short documents fit in a single chunk; skip the splitter's
+               # separator search entirely. Only valid in character mode,
+               # where chunk_size and page_content share units.
+               if tokenizer is None and sum(len(d.page_content) for d in documents) <= chunk_size:
+                   result = documents
+               else:
+                   result = self._get_splitter(chunk_size, chunk_overlap, tokenizer).split_documents(documents)
            else:
-               return loader.load()
+               result = loader.load()
        elif output_format == "text":
-           # Return combined plain text only
-           parser = CustomPDFParser(**self.parser_config)
-           parsed_data = parser.parse_pdf(pdf_path)
-           return parsed_data.get("full_text", "")
+           # Stream per-page text rather than materializing the parser's
+           # full structured result just to read full_text out of it.
+           # Header/footer removal needs all pages up front, so when it is
+           # enabled the page-at-a-time path would silently produce
+           # different text than parse_pdf; defer to parse_pdf_text_only,
+           # which falls back to the full memoized parse in that case.
+           parser = self._get_parser()
+           if output_stream is not None:
+               if parser.remove_headers_footers:
+                   output_stream.write(parser.parse_pdf_text_only(pdf_path))
+               else:
+                   for i, page_text in enumerate(parser.iter_page_text(pdf_path)):
+                       if i:
+                           output_stream.write("\n\n")
+                       output_stream.write(page_text)
+               return None
+           result = parser.parse_pdf_text_only(pdf_path)
        else:
-           raise ValueError(f"Unknown output_format: {output_format}")
\ No newline at end of file
+           raise ValueError(f"Unknown output_format: {output_format}")
+       if cache_key is not None:
+           with self._result_cache_lock:
+               self._result_cache[cache_key] = result
+               # Evict the least recently used entry once over capacity
+               if len(self._result_cache) > self._result_cache_size:
+                   self._result_cache.popitem(last=False)
+           # The caller gets a copy too, so the entry it just populated
+           # stays pristine for later hits
+           return _copy_result(result)
+       return result
+   def process_single_pdf_iter(
+       self,pdf_path: str,chunk_documents: bool = True,chunk_size: int = 500,chunk_overlap: int = 50
+   ) -> Iterator[Document]:
+       """
+       Stream LangChain Document chunks one page at a time. Peak memory is
+       bounded by a single page's chunks rather than the whole document,
+       so downstream embedding/indexing can consume in streaming fashion.
+       Args:
+           pdf_path: path to PDF file
+           chunk_documents: whether to split page documents into chunks
+           chunk_size: chunk size for splitting
+           chunk_overlap: chunk overlap for splitting
+       Returns:
+           Iterator over Document objects (chunked if requested)
+       """
+       loader = LangChainPDFLoader(pdf_path, self.parser_config, chunk_size, chunk_overlap)
+       if not chunk_documents:
+           yield from loader.lazy_load()
+           return
+       text_splitter = self._get_splitter(chunk_size, chunk_overlap)
+       # Split each page as it is loaded and emit its chunks immediately
+       for document in loader.lazy_load():
+           yield from text_splitter.split_documents([document])
+   def process_pdfs(
+       self,pdf_paths: List[str],max_workers: Optional[int] = None,max_concurrent_results: int = 32,backend: str = "thread",**kwargs
+   ) -> List[Any]:
+       """
+       Process multiple PDFs concurrently. The "thread" backend overlaps
+       file I/O and GIL-releasing C-extension work; the "process" backend
+       gives each worker its own interpreter for true N-core scaling when
+       parsing is CPU-bound Python work.
+       Args:
+           pdf_paths: list of PDF file paths
+           max_workers: worker count; defaults to the PDF_PARSER_NUM_THREADS
+               environment variable, else min(32, cpu_count) for threads and
+               cpu_count - 1 for processes
+           max_concurrent_results: cap on in-flight unconsumed results so
+               memory stays bounded when producers outrun the consumer
+           backend: "thread" (I/O-bound parsing) or "process" (CPU-bound)
+           **kwargs: forwarded to process_single_pdf
+       Returns:
+           List of per-file results in the same order as pdf_paths
+       """
+       if backend == "process":
+           if max_workers is None:
+               max_workers = int(os.environ.get(
+                   "PDF_PARSER_NUM_THREADS", max(1, (os.cpu_count() or 2) - 1)))
+           # Each worker rebuilds the pipeline from parser_config, so only
+           # plain config values cross the process boundary
+           jobs = [(self.parser_config, pdf_path, kwargs) for pdf_path in pdf_paths]
+           with ProcessPoolExecutor(max_workers=max_workers) as executor:
+               return list(executor.map(_process_pdf_worker, jobs))
+       elif backend != "thread":
+           raise ValueError(f"Unknown backend: {backend}")
+       if max_workers is None:
+           max_workers = int(os.environ.get(
+               "PDF_PARSER_NUM_THREADS", min(32, os.cpu_count() or 1)))
+       results = []
+       with ThreadPoolExecutor(max_workers=max_workers) as executor:
+           pending = deque()
+           for pdf_path in pdf_paths:
+               pending.append(executor.submit(self.process_single_pdf, pdf_path, **kwargs))
+               # Drain the oldest future once the in-flight window is full
+               if len(pending) >= max_concurrent_results:
+                   results.append(pending.popleft().result())
+           while pending:
+               results.append(pending.popleft().result())
+       return results
+   async def aprocess_single_pdf(self, url_or_path: str, **kwargs) -> Any:
+       """
+       Async variant of process_single_pdf. http(s) URLs are downloaded
+       with aiohttp to a temporary file so network latency overlaps other
+       tasks; the blocking parse itself is offloaded to the default
+       executor so the event loop stays responsive.
+       Args:
+           url_or_path: local path or http(s) URL of a PDF
+           **kwargs: forwarded to process_single_pdf
+       Returns:
+           Parsed content in the requested format
+       """
+       loop = asyncio.get_running_loop()
+       if url_or_path.startswith(("http://", "https://")):
+           if aiohttp is None:
+               raise RuntimeError("aiohttp is required to process remote PDFs")
+           async with aiohttp.ClientSession() as session:
+               async with session.get(url_or_path) as response:
+                   response.raise_for_status()
+                   data = await response.read()
+           with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+               tmp.write(data)
+               local_path = tmp.name
+           try:
+               return await loop.run_in_executor(
+                   None, lambda: self.process_single_pdf(local_path, **kwargs))
+           finally:
+               os.unlink(local_path)
+       return await loop.run_in_executor(
+           None, lambda: self.process_single_pdf(url_or_path, **kwargs))
+   async def aprocess_pdfs(self, paths: List[str], max_concurrent: int = 8, **kwargs) -> List[Any]:
+       """
+       Process many local or remote PDFs concurrently with asyncio. A
+       semaphore bounds in-flight downloads/parses for backpressure.
+       Args:
+           paths: local paths or http(s) URLs
+           max_concurrent: maximum simultaneous fetch+parse tasks
+           **kwargs: forwarded to process_single_pdf
+       Returns:
+           List of per-file results in the same order as paths
+       """
+       semaphore = asyncio.Semaphore(max_concurrent)
+       async def _bounded(path):
+           async with semaphore:
+               return await self.aprocess_single_pdf(path, **kwargs)
+       return list(await asyncio.gather(*(_bounded(path) for path in paths)))
+# Sentinel marking the end of a stage's output stream
+_STAGE_DONE = object()
+class StagedPipeline:
+   """
+   Two-stage load/split pipeline connected by bounded queues. A loader
+   thread streams page Documents to a splitter thread, so I/O-bound page
+   loading overlaps CPU-bound chunk splitting and total latency approaches
+   the slower stage's time instead of the sum of both. The queue size acts
+   as backpressure so neither stage can run unboundedly ahead.
+   """
+   def __init__(
+       self,parser_config: Optional[Dict[str, Any]] = None,chunk_size: int = 500,chunk_overlap: int = 50,max_concurrent_results: int = 32
+   ):
+       """
+       Args:
+           parser_config: dictionary of options passed to CustomPDFParser
+           chunk_size: chunk size for splitting
+           chunk_overlap: chunk overlap for splitting
+           max_concurrent_results: bound on each inter-stage queue
+       """
+       self.parser_config = parser_config or {}
+       self.chunk_size = chunk_size
+       self.chunk_overlap = chunk_overlap
+       self.max_concurrent_results = max_concurrent_results
+   def process(self, pdf_path: str) -> Iterator[Document]:
+       """
+       Stream chunked Documents for pdf_path with load and split stages
+       running concurrently.
+       Args:
+           pdf_path: path to PDF file
+       Returns:
+           Iterator over chunked Document objects
+       """
+       load_queue: queue.Queue = queue.Queue(maxsize=self.max_concurrent_results)
+       out_queue: queue.Queue = queue.Queue(maxsize=self.max_concurrent_results)
+       errors: List[BaseException] = []
+       # Set when the split stage exits so a producer blocked on a full
+       # load queue can bail out instead of deadlocking
+       abort = threading.Event()
+       loader = LangChainPDFLoader(pdf_path, self.parser_config, self.chunk_size, self.chunk_overlap)
+       text_splitter = RecursiveCharacterTextSplitter(
+           chunk_size=self.chunk_size,
+           chunk_overlap=self.chunk_overlap,
+           separators=["\n\n", "\n", " ", ""]  # hierarchical splitting
+       )
+       def _put_unless_aborted(item):
+           # Timed puts so the producer notices an aborted consumer;
+           # returns False once the pipeline is shutting down
+           while not abort.is_set():
+               try:
+                   load_queue.put(item, timeout=0.1)
+                   return True
+               except queue.Full:
+                   continue
+           return False
+       def _load_stage():
+           # Producer: feed page Documents into the bounded load queue
+           try:
+               for document in loader.lazy_load():
+                   if not _put_unless_aborted(document):
+                       return
+           except BaseException as e:
+               errors.append(e)
+           finally:
+               _put_unless_aborted(_STAGE_DONE)
+       def _split_stage():
+           # Consumer/producer: split pages as they arrive, emit chunks
+           try:
+               while True:
+                   document = load_queue.get()
+                   if document is _STAGE_DONE:
+                       break
+                   for chunk in text_splitter.split_documents([document]):
+                       out_queue.put(chunk)
+           except BaseException as e:
+               errors.append(e)
+           finally:
+               # Unblock a producer stuck on a full load queue: signal the
+               # abort and drain whatever it already queued
+               abort.set()
+               try:
+                   while True:
+                       load_queue.get_nowait()
+               except queue.Empty:
+                   pass
+               out_queue.put(_STAGE_DONE)
+       load_thread = threading.Thread(target=_load_stage, daemon=True)
+       split_thread = threading.Thread(target=_split_stage, daemon=True)
+       load_thread.start()
+       split_thread.start()
+       while True:
+           chunk = out_queue.get()
+           if chunk is _STAGE_DONE:
+               break
+           yield chunk
+       load_thread.join()
+       split_thread.join()
+       if errors:
+           raise errors[0]
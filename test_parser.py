@@ -1,12 +1,41 @@
 
 
 from credit_card_parser import CreditCardStatementParser
-import json
+from json_out import dump_json
+import argparse
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 def print_separator(char="=", length=80):
     print("\n" + char*length + "\n")
 
+# Shared parser instance so batch/repeat runs pay construction cost once
+_cc_parser = None
+
+def _get_cc_parser():
+    global _cc_parser
+    if _cc_parser is None:
+        _cc_parser = CreditCardStatementParser()
+    return _cc_parser
+
+def summarize_statement(pdf_path):
+    """Parse one statement and log a one-line summary (batch mode)."""
+    result = _get_cc_parser().parse_statement(pdf_path)
+    name = Path(pdf_path).name
+    if "error" in result:
+        logger.info(f"{name}: ERROR {result['error']}")
+        return
+    logger.info(
+        f"{name}: issuer={result.get('issuer')} "
+        f"last4={result.get('card_last_4_digits')} "
+        f"amount_due={result.get('total_amount_due')} "
+        f"due_date={result.get('payment_due_date')} "
+        f"transactions={len(result.get('transactions', []))}")
+
 def test_credit_card_parser(pdf_path):
     """Test the credit card parser with a PDF file"""
     
@@ -14,39 +43,53 @@ def test_credit_card_parser(pdf_path):
     print("🔍 CREDIT CARD STATEMENT PARSER - STANDALONE TEST")
     print_separator()
     
+    # Build the Path once; .exists() and .name below reuse it
+    pdf_file = Path(pdf_path)
+
     # Check if file exists
-    if not Path(pdf_path).exists():
+    if not pdf_file.exists():
         print(f"❌ Error: File not found at {pdf_path}")
         return
-    
-    print(f"📄 Processing file: {Path(pdf_path).name}")
+
+    print(f"📄 Processing file: {pdf_file.name}")
     print(f"📁 Full path: {pdf_path}")
     print("\n⏳ Parsing in progress...")
     
-    # Initialize parser
-    parser = CreditCardStatementParser()
+    # Reuse the shared parser instance
+    parser = _get_cc_parser()
     
     try:
         # Parse the statement
         result = parser.parse_statement(pdf_path)
         
+        # Pull the key data points out once; the display lines and the
+        # summary count below share these instead of repeating .get calls
+        issuer, last4, period, amount_due, due_date = (
+            result.get(key) for key in (
+                'issuer', 'card_last_4_digits', 'statement_period',
+                'total_amount_due', 'payment_due_date'))
+
         # Check for errors
-        if "error" in result and result.get('issuer') == 'Unknown':
+        if "error" in result and issuer == 'Unknown':
             print_separator()
             print(f"❌ PARSING ERROR: {result['error']}")
             print_separator()
             return
-        
+
         # Display results
         print_separator()
         print("✅ EXTRACTION COMPLETE - 5 KEY DATA POINTS")
         print_separator()
-        
-        print(f"1️⃣  Card Issuer:          {result.get('issuer', 'Not detected')}")
-        print(f"2️⃣  Card Last 4 Digits:   {result.get('card_last_4_digits', 'Not found')}")
-        print(f"3️⃣  Statement Period:     {result.get('statement_period', 'Not found')}")
-        print(f"4️⃣  Total Amount Due:     {result.get('total_amount_due', 'Not found')}")
-        print(f"5️⃣  Payment Due Date:     {result.get('payment_due_date', 'Not found')}")
+
+        # One formatted block, one print: ~6 write syscalls become 1
+        rows = [
+            ("1️⃣  Card Issuer:", issuer or 'Not detected'),
+            ("2️⃣  Card Last 4 Digits:", last4 or 'Not found'),
+            ("3️⃣  Statement Period:", period or 'Not found'),
+            ("4️⃣  Total Amount Due:", amount_due or 'Not found'),
+            ("5️⃣  Payment Due Date:", due_date or 'Not found'),
+        ]
+        print("\n".join(f"{label:<25}{value}" for label, value in rows))
         
         print_separator()
         
@@ -69,17 +112,19 @@ def test_credit_card_parser(pdf_path):
         # Display metadata
         print("📋 DOCUMENT INFORMATION\n")
         metadata = result.get('raw_metadata', {})
-        print(f"  File Name:       {metadata.get('file_name', 'N/A')}")
-        print(f"  File Size:       {metadata.get('file_size', 'N/A')} bytes")
-        print(f"  Total Pages:     {metadata.get('total_pages', 'N/A')}")
-        print(f"  Extraction Time: {result.get('extraction_timestamp', 'N/A')}")
+        info_rows = [
+            ("  File Name:", metadata.get('file_name', 'N/A')),
+            ("  File Size:", f"{metadata.get('file_size', 'N/A')} bytes"),
+            ("  Total Pages:", metadata.get('total_pages', 'N/A')),
+            ("  Extraction Time:", result.get('extraction_timestamp', 'N/A')),
+        ]
+        print("\n".join(f"{label:<19}{value}" for label, value in info_rows))
         
         print_separator()
         
         # Save full results to JSON
         output_file = "cc_statement_parsed.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        dump_json(result, output_file)
         
         print(f"💾 Full results saved to: {output_file}")
         print("   You can open this file to see all extracted data in JSON format")
@@ -87,13 +132,9 @@ def test_credit_card_parser(pdf_path):
         print_separator()
         
         # Summary
-        found_count = sum([
-            1 if result.get('issuer') and result.get('issuer') != 'Unknown' else 0,
-            1 if result.get('card_last_4_digits') else 0,
-            1 if result.get('statement_period') else 0,
-            1 if result.get('total_amount_due') else 0,
-            1 if result.get('payment_due_date') else 0
-        ])
+        # Generator of bools: no intermediate list, bool sums as 0/1
+        found_count = sum(bool(value) for value in (
+            issuer and issuer != 'Unknown', last4, period, amount_due, due_date))
         
         print("📊 EXTRACTION SUMMARY\n")
         print(f"   ✅ Successfully extracted: {found_count}/5 data points")
@@ -116,18 +157,65 @@ def test_credit_card_parser(pdf_path):
 
 def main():
     """Main function to run the test"""
-    
+
+    arg_parser = argparse.ArgumentParser(
+        description="Credit Card Statement Parser - Standalone Test")
+    arg_parser.add_argument(
+        "pdf_paths", nargs="*",
+        help="paths to credit card statement PDFs (prompts when omitted)")
+    arg_parser.add_argument(
+        "--repeat", action="store_true",
+        help="keep prompting for more files so imports and parser setup "
+             "are paid once per session instead of once per invocation")
+    arg_parser.add_argument(
+        "--verbose", action="store_true",
+        help="show the full per-file report in batch mode instead of "
+             "one-line summaries")
+    args = arg_parser.parse_args()
+
     print("\n🚀 Credit Card Statement Parser - Standalone Test\n")
-    
-    # Get PDF path from user
-    pdf_path = input("📄 Enter the path to your credit card statement PDF: ").strip()
-    
-    # Remove quotes if user wrapped path in quotes
-    pdf_path = pdf_path.strip('"').strip("'")
-    
-    # Test the parser
-    test_credit_card_parser(pdf_path)
-    
+
+    # Batch mode: process every path given on the command line. Unless
+    # --verbose is set, output is one summary line per file, routed through
+    # a QueueListener so stdout writes happen on a single background thread
+    # rather than serializing the parse loop on print flushes.
+    if args.pdf_paths:
+        if args.verbose or len(args.pdf_paths) == 1:
+            for pdf_path in args.pdf_paths:
+                test_credit_card_parser(pdf_path)
+        else:
+            log_queue = queue.Queue(-1)
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(logging.Formatter("%(message)s"))
+            listener = QueueListener(log_queue, stream_handler)
+            logger.addHandler(QueueHandler(log_queue))
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            listener.start()
+            try:
+                for pdf_path in args.pdf_paths:
+                    summarize_statement(pdf_path)
+            finally:
+                listener.stop()
+        print("\n✨ Test complete!\n")
+        return
+
+    # Interactive mode: prompt for paths, looping with --repeat
+    while True:
+        pdf_path = input("📄 Enter the path to your credit card statement PDF: ").strip()
+
+        # Remove quotes if user wrapped path in quotes
+        pdf_path = pdf_path.strip('"').strip("'")
+
+        if not pdf_path:
+            break
+
+        # Test the parser
+        test_credit_card_parser(pdf_path)
+
+        if not args.repeat:
+            break
+
     print("\n✨ Test complete!\n")
 
 if __name__ == "__main__":